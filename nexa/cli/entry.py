@@ -462,7 +462,13 @@ def main():
     text_group.add_argument("-p", "--top_p", type=float, help="Top-p sampling parameter")
     text_group.add_argument("-sw", "--stop_words", nargs="*", help="List of stop words for early stopping")
     text_group.add_argument("--lora_path", type=str, help="Path to a LoRA file to apply to the model.")
-    text_group.add_argument("--nctx", type=int, default=2048, help="Maximum context length of the model you're using")
+    text_group.add_argument("--nctx", type=int, help="Maximum context length of the model you're using (default: 2048, 4096 for VLM)")
+    text_group.add_argument("--n_threads", type=int, help="Number of threads to use for generation (VLM; default: half the CPU cores, 4-8 with GPU offload)")
+    text_group.add_argument("--n_threads_batch", type=int, help="Number of threads to use for prompt and image processing (VLM; default: all CPU cores)")
+    text_group.add_argument("--n_batch", type=int, help="Logical batch size for prompt processing (VLM; default: 512)")
+    text_group.add_argument("--n_ubatch", type=int, help="Physical batch size for prompt processing (VLM; default: 512)")
+    text_group.add_argument("-ngl", "--n_gpu_layers", type=int, help="Number of layers to offload to GPU (VLM; default: all if a GPU is available)")
+    text_group.add_argument("--no_flash_attn", dest="flash_attn", action="store_false", default=None, help="Disable flash attention, e.g. on backends without the kernel (VLM)")
 
     # Image generation arguments
     image_group = run_parser.add_argument_group('Image generation options')
@@ -490,7 +496,6 @@ def main():
     tts_group = run_parser.add_argument_group('Text-to-Speech options')
     tts_group.add_argument("--output_dir", type=str, default="tts", help="Output directory for tts")
     tts_group.add_argument("--sampling_rate", type=int, default=24000, help="Sampling rate for audio processing")
-    tts_group.add_argument("--n_threads", type=int, default=1, help="Number of threads to use for processing")
     tts_group.add_argument("--seed", type=int, default=0, help="Seed for random number generation")
     tts_group.add_argument("--verbosity", type=int, default=1, help="Verbosity level for the Bark model")
 
@@ -94,6 +94,8 @@ NEXA_RUN_MODEL_MAP_ONNX = {
     "ljspeech": "ljspeech-jets:onnx-cpu-fp32",
 }
 
+# Short VLM aliases resolve to the 4-bit builds; other precisions are selected
+# with an explicit tag (e.g. "llava-phi-3-mini:fp16"). nanoLLaVA only ships fp16.
 NEXA_RUN_MODEL_MAP_VLM = {
     "nanollava": "nanoLLaVA:model-fp16",
     "nanoLLaVA:fp16": "nanoLLaVA:model-fp16",
@@ -362,6 +364,12 @@ DEFAULT_TEXT_GEN_PARAMS = {
     "top_p": 1.0,
 }
 
+# Each image alone takes ~576 tokens of context for LLaVA-style models
+DEFAULT_VLM_GEN_PARAMS = {
+    **DEFAULT_TEXT_GEN_PARAMS,
+    "nctx": 4096,
+}
+
 DEFAULT_IMG_GEN_PARAMS = {
     "num_inference_steps": 20,
     "height": 512,
@@ -117,7 +117,7 @@ def pull_model(model_path, hf = False, ms = False, **kwargs):
         elif ms == True:
             result = pull_model_from_ms(model_path, **kwargs)
         else: 
-            if is_model_exists(model_path):
+            if not _is_force_refresh() and is_model_exists(model_path):
                 location, run_type = get_model_info(model_path)
                 print(f"Model {model_path} already exists at {location}")
                 return location, run_type
@@ -146,6 +146,39 @@ def pull_model(model_path, hf = False, ms = False, **kwargs):
         return None, None
 
 
+def _is_force_refresh() -> bool:
+    """Whether NEXA_FORCE_REFRESH=1 asks to re-download models that are already cached."""
+    return os.getenv("NEXA_FORCE_REFRESH") == "1"
+
+
+def get_cached_official_model_path(model_path):
+    """
+    Get the local path of an official GGUF model if it is already downloaded.
+
+    Stats the file at the location download_model_from_official uses and skips
+    pull_model's progress output. The model list entry is still required,
+    since it is only written after a download completes; a file without one
+    may be truncated by an interrupted download from an older release.
+
+    Args:
+    model_path (str): Official model path, e.g. "llava-phi-3-mini:model-q4_0".
+
+    Returns:
+    str: Path to the cached file, or None if it is missing, empty, not in the
+        model list, or NEXA_FORCE_REFRESH=1 is set.
+    """
+    if _is_force_refresh() or ":" not in model_path:
+        return None
+    model_name, model_version = model_path.split(":")
+    full_path = NEXA_MODELS_HUB_OFFICIAL_DIR / model_name / f"{model_version}.gguf"
+    try:
+        if full_path.stat().st_size == 0:
+            return None
+    except OSError:
+        return None
+    return str(full_path) if is_model_exists(model_path) else None
+
+
 def pull_model_from_hub(model_path, **kwargs):
     NEXA_MODELS_HUB_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -345,6 +378,8 @@ def download_file_with_progress(
 ):
     file_path.parent.mkdir(parents=True, exist_ok=True)
     
+    partial_path = file_path.with_name(f"{file_path.name}.part")
+
     # Create a temporary directory for chunks
     temp_dir = Path(tempfile.mkdtemp())
 
@@ -407,12 +442,15 @@ def download_file_with_progress(
             
             buffer_size = 1 * 1024 * 1024  # 1MB buffer
             
-            with open(file_path, "wb") as final_file:
+            # Join into a side file and rename it into place once complete, so
+            # an interrupted join never leaves a truncated file at file_path
+            with open(partial_path, "wb") as final_file:
                 for i in range(len(chunks)):
                     chunk_file = temp_dir / f"{file_path.name}.part{i}"
                     with open(chunk_file, "rb") as part_file:
                         shutil.copyfileobj(part_file, final_file, buffer_size)
                         combine_progress.update(os.path.getsize(chunk_file))
+            os.replace(partial_path, file_path)
             
             combine_progress.close()
         else:
@@ -426,6 +464,9 @@ def download_file_with_progress(
     finally:
         # Clean up temporary directory and all its contents
         shutil.rmtree(temp_dir)
+        # Also covers KeyboardInterrupt, which the handler above does not catch
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
 
 
 def download_model_from_official(model_path, model_type, **kwargs):
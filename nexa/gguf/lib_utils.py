@@ -49,17 +49,7 @@ def load_library(lib_base_name: str):
 
     # Add the library directory to the DLL search path on Windows (if needed)
     if sys.platform == "win32":
-        os.add_dll_directory(str(_base_path))
-        os.environ["PATH"] = str(_base_path) + os.pathsep + os.environ["PATH"]
-
-    if sys.platform == "win32" and sys.version_info >= (3, 8):
-        os.add_dll_directory(str(_base_path))
-        if "CUDA_PATH" in os.environ:
-            os.add_dll_directory(os.path.join(os.environ["CUDA_PATH"], "bin"))
-            os.add_dll_directory(os.path.join(os.environ["CUDA_PATH"], "lib"))
-        if "HIP_PATH" in os.environ:
-            os.add_dll_directory(os.path.join(os.environ["HIP_PATH"], "bin"))
-            os.add_dll_directory(os.path.join(os.environ["HIP_PATH"], "lib"))
+        _add_windows_dll_directories(_base_path)
         cdll_args["winmode"] = ctypes.RTLD_GLOBAL
 
     # Try to load the shared library, handling potential errors
@@ -75,24 +65,36 @@ def load_library(lib_base_name: str):
     )
 
 
+def _prepend_to_path(path: Path) -> None:
+    """Prepend a directory to PATH unless it is already there."""
+    paths = os.environ.get("PATH", "").split(os.pathsep)
+    if str(path) not in paths:
+        os.environ["PATH"] = os.pathsep.join([str(path)] + paths)
+
+
 def _add_windows_dll_directories(base_path: Path) -> None:
     os.add_dll_directory(str(base_path))
-    os.environ["PATH"] = str(base_path) + os.pathsep + os.environ["PATH"]
+    _prepend_to_path(base_path)
 
     if is_gpu_available():
         try_add_cuda_lib_path()
 
-        if sys.version_info >= (3, 8):
-            if "CUDA_PATH" in os.environ:
-                os.add_dll_directory(os.path.join(os.environ["CUDA_PATH"], "bin"))
-                os.add_dll_directory(os.path.join(os.environ["CUDA_PATH"], "lib"))
-            if "HIP_PATH" in os.environ:
-                os.add_dll_directory(os.path.join(os.environ["HIP_PATH"], "bin"))
-                os.add_dll_directory(os.path.join(os.environ["HIP_PATH"], "lib"))
+    # Not gated on is_gpu_available(): LLAMA_CPP_LIB may point at a GPU build
+    # on top of a CPU wheel, which still needs the toolkit DLLs.
+    if sys.version_info >= (3, 8):
+        if "CUDA_PATH" in os.environ:
+            os.add_dll_directory(os.path.join(os.environ["CUDA_PATH"], "bin"))
+            os.add_dll_directory(os.path.join(os.environ["CUDA_PATH"], "lib"))
+        if "HIP_PATH" in os.environ:
+            os.add_dll_directory(os.path.join(os.environ["HIP_PATH"], "bin"))
+            os.add_dll_directory(os.path.join(os.environ["HIP_PATH"], "lib"))
 
 
 def try_add_cuda_lib_path():
     """Try to add the CUDA library paths to the system PATH."""
+    if sys.platform != "win32":
+        return
+
     required_submodules = ["cuda_runtime", "cublas"]
     cuda_versions = ["11", "12"]
 
@@ -110,7 +112,7 @@ def try_add_cuda_lib_path():
 
                 lib_path = nvidia_lib_root / submodule / "bin"
                 os.add_dll_directory(str(lib_path))
-                os.environ["PATH"] = str(lib_path) + os.pathsep + os.environ["PATH"]
+                _prepend_to_path(lib_path)
                 logging.debug(f"Added {lib_path} to PATH")
             except PackageNotFoundError:
                 logging.debug(f"{package_name} not found")
@@ -1,3 +1,4 @@
+import ctypes
 import os
 import sys
 
@@ -10,6 +11,18 @@ errnull_file = open(os.devnull, "w")
 STDOUT_FILENO = 1
 STDERR_FILENO = 2
 
+# C runtime used to flush native stdio buffers (printf/fprintf from llama.cpp
+# and clip.cpp); not available as a single shared CRT on Windows.
+try:
+    _libc = ctypes.CDLL(None) if sys.platform != "win32" else None
+except OSError:
+    _libc = None
+
+
+def _flush_c_stdio():
+    if _libc is not None:
+        _libc.fflush(None)
+
 
 class suppress_stdout_stderr(object):
     # NOTE: these must be "saved" here to avoid exceptions when using
@@ -34,6 +47,8 @@ class suppress_stdout_stderr(object):
         self.old_stdout = self.sys.stdout
         self.old_stderr = self.sys.stderr
 
+        # Emit anything native code buffered before suppression started
+        _flush_c_stdio()
         self.os.dup2(outnull_file.fileno(), self.old_stdout_fileno_undup)
         self.os.dup2(errnull_file.fileno(), self.old_stderr_fileno_undup)
 
@@ -49,6 +64,9 @@ class suppress_stdout_stderr(object):
         self.sys.stdout = self.old_stdout
         self.sys.stderr = self.old_stderr
 
+        # Drain native output buffered while suppressed into devnull, otherwise
+        # it is flushed to the terminal once the descriptors are restored
+        _flush_c_stdio()
         self.os.dup2(self.old_stdout_fileno, self.old_stdout_fileno_undup)
         self.os.dup2(self.old_stderr_fileno, self.old_stderr_fileno_undup)
 
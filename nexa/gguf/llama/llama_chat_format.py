@@ -8,6 +8,7 @@ import dataclasses
 import random
 import string
 
+from collections import OrderedDict
 from contextlib import ExitStack
 from typing import (
     Any,
@@ -2695,7 +2696,12 @@ class Llava15ChatHandler:
         "{% endif %}"
     )
 
-    def __init__(self, clip_model_path: str, verbose: bool = True):
+    def __init__(
+        self,
+        clip_model_path: str,
+        verbose: bool = True,
+        image_embed_cache_size: int = 1,
+    ):
         import nexa.gguf.llama.llava_cpp as llava_cpp
 
         self.clip_model_path = clip_model_path
@@ -2703,15 +2709,24 @@ class Llava15ChatHandler:
 
         self._llava_cpp = llava_cpp  # TODO: Fix
         self._exit_stack = ExitStack()
-        self._last_image_embed: Optional[
-            llava_cpp.CtypesPointer[llava_cpp.llava_image_embed]
-        ] = None
-        self._last_image_hash: Optional[int] = None
+        # Compiled once instead of on every chat completion
+        self._template = ImmutableSandboxedEnvironment(
+            trim_blocks=True,
+            lstrip_blocks=True,
+        ).from_string(self.CHAT_FORMAT)
+        # LRU of image embeddings keyed by the hash of the image bytes, so
+        # follow-up questions about the same image skip the vision tower.
+        self._image_embed_cache: OrderedDict[
+            int, llava_cpp.CtypesPointer[llava_cpp.llava_image_embed]
+        ] = OrderedDict()
+        self._image_embed_cache_size = max(image_embed_cache_size, 1)
 
         if not os.path.exists(clip_model_path):
             raise ValueError(f"Clip model path does not exist: {clip_model_path}")
 
         with suppress_stdout_stderr(disable=self.verbose):
+            # clip.cpp places the projector on the GPU backend the library was
+            # built with (CUDA/Metal/Vulkan/ROCm); there is no per-call switch.
             clip_ctx = self._llava_cpp.clip_model_load(self.clip_model_path.encode(), 0)
 
             if clip_ctx is None:
@@ -2725,13 +2740,35 @@ class Llava15ChatHandler:
 
             self._exit_stack.callback(clip_free)
 
-        def last_image_embed_free():
+        def image_embed_cache_free():
             with suppress_stdout_stderr(disable=self.verbose):
-                if self._last_image_embed is not None:
-                    self._llava_cpp.llava_image_embed_free(self._last_image_embed)
-                    self._last_image_embed = None
-
-        self._exit_stack.callback(last_image_embed_free)
+                while self._image_embed_cache:
+                    _, embed = self._image_embed_cache.popitem()
+                    self._llava_cpp.llava_image_embed_free(embed)
+
+        self._exit_stack.callback(image_embed_cache_free)
+
+    def embed_image_bytes(self, image_bytes: bytes, n_threads: int):
+        image_hash = hash(image_bytes)
+        embed = self._image_embed_cache.get(image_hash)
+        if embed is not None:
+            self._image_embed_cache.move_to_end(image_hash)
+            return embed
+        with suppress_stdout_stderr(disable=self.verbose):
+            # Free the least recently used image embeds
+            while len(self._image_embed_cache) >= self._image_embed_cache_size:
+                _, stale_embed = self._image_embed_cache.popitem(last=False)
+                self._llava_cpp.llava_image_embed_free(stale_embed)
+            embed = self._llava_cpp.llava_image_embed_make_with_bytes(
+                self.clip_ctx,
+                n_threads,
+                (ctypes.c_uint8 * len(image_bytes)).from_buffer(
+                    bytearray(image_bytes)
+                ),
+                len(image_bytes),
+            )
+        self._image_embed_cache[image_hash] = embed
+        return embed
 
     def load_image(self, image_url: str) -> bytes:
         return self._load_image(image_url)
@@ -2786,11 +2823,7 @@ class Llava15ChatHandler:
             ] + messages
 
         image_urls = self.get_image_urls(messages)
-        template = ImmutableSandboxedEnvironment(
-            trim_blocks=True,
-            lstrip_blocks=True,
-        ).from_string(self.CHAT_FORMAT)
-        text = template.render(
+        text = self._template.render(
             messages=messages,
             add_generation_prompt=True,
             eos_token=llama.detokenize([llama.token_eos()]),
@@ -2798,31 +2831,6 @@ class Llava15ChatHandler:
         )
         split_text = self.split_text_on_image_urls(text, image_urls)
 
-        def embed_image_bytes(image_bytes: bytes):
-            if (
-                self._last_image_embed is not None
-                and self._last_image_hash is not None
-                and hash(image_bytes) == self._last_image_hash
-            ):
-                return self._last_image_embed
-            with suppress_stdout_stderr(disable=self.verbose):
-                # Free the previous image embed
-                if self._last_image_embed is not None:
-                    self._llava_cpp.llava_image_embed_free(self._last_image_embed)
-                    self._last_image_embed = None
-                    self._last_image_hash = None
-                embed = self._llava_cpp.llava_image_embed_make_with_bytes(
-                    self.clip_ctx,
-                    llama.context_params.n_threads_batch,
-                    (ctypes.c_uint8 * len(image_bytes)).from_buffer(
-                        bytearray(image_bytes)
-                    ),
-                    len(image_bytes),
-                )
-                self._last_image_embed = embed
-                self._last_image_hash = hash(image_bytes)
-                return embed
-
         # Evaluate prompt
         llama.reset()
         llama._ctx.kv_cache_clear()
@@ -2838,7 +2846,9 @@ class Llava15ChatHandler:
                 llama.eval(tokens)
             else:
                 image_bytes = self.load_image(value)
-                embed = embed_image_bytes(image_bytes)
+                embed = self.embed_image_bytes(
+                    image_bytes, llama.context_params.n_threads_batch
+                )
                 if llama.n_tokens + embed.contents.n_image_pos > llama.n_ctx():
                     raise ValueError(
                         f"Prompt exceeds n_ctx: {llama.n_tokens + embed.contents.n_image_pos} > {llama.n_ctx()}"
@@ -17,7 +17,6 @@ from nexa.constants import (
 from nexa.utils import SpinningCursorAnimation, nexa_prompt
 from nexa.gguf.llama._utils_transformers import suppress_stdout_stderr
 
-from streamlit.web import cli as stcli
 from nexa.general import pull_model
 
 logging.basicConfig(
@@ -331,6 +330,8 @@ class NexaImageInference:
             / "streamlit_image_chat.py"
         )
 
+        from streamlit.web import cli as stcli
+
         sys.argv = ["streamlit", "run", str(streamlit_script_path), model_path, str(is_local_path), str(hf)]
         sys.exit(stcli.main())
 
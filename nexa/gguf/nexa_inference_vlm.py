@@ -1,29 +1,23 @@
 import argparse
 import base64
-import glob
 import logging
 import os
 import readline
 import sys
+import tempfile
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Iterator, List, Union
-
-from streamlit.web import cli as stcli
+from typing import Iterator, List, Optional, Union
 
 from nexa.constants import (
-    DEFAULT_TEXT_GEN_PARAMS,
+    DEFAULT_VLM_GEN_PARAMS,
     NEXA_RUN_CHAT_TEMPLATE_MAP,
     NEXA_RUN_MODEL_MAP_VLM,
     NEXA_RUN_PROJECTOR_MAP,
 )
-from nexa.general import pull_model
+from nexa.general import get_cached_official_model_path, pull_model
 from nexa.gguf.lib_utils import is_gpu_available
-from nexa.gguf.llama.llama_chat_format import (
-    Llava15ChatHandler,
-    Llava16ChatHandler,
-    NanoLlavaChatHandler,
-)
 from nexa.utils import SpinningCursorAnimation, nexa_prompt
 from nexa.gguf.llama._utils_transformers import suppress_stdout_stderr
 
@@ -32,34 +26,195 @@ logging.basicConfig(
 )
 
 
+# Directory listing reused across TAB presses: (dirname, timestamp, entries)
+_dir_listing_cache = (None, 0.0, [])
+_DIR_LISTING_TTL = 1.0
+_completion_matches: List[str] = []
+
+
+def _list_dir(dirname: str) -> List[tuple]:
+    global _dir_listing_cache
+    cached_dir, cached_at, entries = _dir_listing_cache
+    now = time.monotonic()
+    if cached_dir == dirname and now - cached_at < _DIR_LISTING_TTL:
+        return entries
+    try:
+        with os.scandir(dirname or ".") as it:
+            entries = [(entry.name, entry.is_dir()) for entry in it]
+    except OSError:
+        entries = []
+    _dir_listing_cache = (dirname, now, entries)
+    return entries
+
+
 def _complete(text, state):
-    return (glob.glob(text + "*") + [None])[state]
+    # readline calls this with state 0, 1, 2, ... until it gets None, so
+    # the matches are only computed once per TAB press.
+    if state == 0:
+        dirname, prefix = os.path.split(text)
+        show_hidden = prefix.startswith(".")
+        _completion_matches[:] = sorted(
+            os.path.join(dirname, name) + (os.sep if is_dir else "")
+            for name, is_dir in _list_dir(dirname)
+            if name.startswith(prefix) and (show_hidden or not name.startswith("."))
+        )
+    return (_completion_matches + [None])[state]
+
+
+# Multiple of 3 so every chunk encodes without padding
+_BASE64_CHUNK_SIZE = 48 * 1024
+
+# Longest image side each handler's vision encoder can use; clip.cpp resizes
+# anything larger away. llava-1.5 style encoders take a single square tile,
+# llava-1.6 picks a grid of 336px tiles from the GGUF's pinpoints, the widest
+# of which are 1008x336 and 336x1008. Images for other handlers are left as is.
+_HANDLER_MAX_IMAGE_SIZE = {
+    "Llava15ChatHandler": 336,
+    "ObsidianChatHandler": 336,
+    "Llama3VisionAlphaChatHandler": 336,
+    "MoondreamChatHandler": 378,
+    "NanoLlavaChatHandler": 384,
+    "Llava16ChatHandler": 1008,
+}
+
+
+def _detect_image_mime(header: bytes) -> str:
+    """Guess the image MIME type from its magic bytes, defaulting to PNG."""
+    if header.startswith(b"\x89PNG"):
+        return "image/png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header.startswith(b"GIF8"):
+        return "image/gif"
+    return "image/png"
+
+
+def _bytes_to_base64_data_uri(image_bytes: bytes) -> str:
+    raw = memoryview(image_bytes)
+    mime = _detect_image_mime(bytes(raw[:12]))
+    # Encode in chunks into a single buffer to avoid holding the full
+    # encoded copy alongside the final string.
+    data_uri = bytearray(f"data:{mime};base64,".encode("ascii"))
+    for start in range(0, len(raw), _BASE64_CHUNK_SIZE):
+        data_uri += base64.b64encode(raw[start : start + _BASE64_CHUNK_SIZE])
+    return data_uri.decode("ascii")
 
 
 def image_to_base64_data_uri(file_path):
     if file_path and os.path.exists(file_path):
         with open(file_path, "rb") as img_file:
-            base64_data = base64.b64encode(img_file.read()).decode("utf-8")
-            return f"data:image/png;base64,{base64_data}"
+            return _bytes_to_base64_data_uri(img_file.read())
     return None
 
 
+# Downscaled copies of user images, keyed by (realpath, st_mtime_ns, st_size,
+# max_size) so repeat turns on the same file skip decoding it again. A None value means
+# the original file is used as is.
+_downscaled_images: "OrderedDict[tuple, Optional[str]]" = OrderedDict()
+_DOWNSCALED_IMAGES_MAX = 16
+_downscaled_images_dir: Optional[tempfile.TemporaryDirectory] = None
+
+
+def _downscale_image(file_path: str, max_size: int) -> Optional[str]:
+    """
+    Write a copy of the image whose longer side is at most max_size pixels.
+
+    JPEG input stays JPEG; anything else is saved as lossless PNG so text and
+    screenshots keep their edges. Returns the path of the copy, or None if the
+    image is already small enough or cannot be decoded by Pillow.
+    """
+    global _downscaled_images_dir
+    from PIL import Image
+
+    try:
+        with Image.open(file_path) as img:
+            if max(img.size) <= max_size:
+                return None
+            is_jpeg = img.format == "JPEG"
+            img = img.convert("RGB")
+            img.thumbnail((max_size, max_size), Image.BILINEAR)
+            if _downscaled_images_dir is None:
+                _downscaled_images_dir = tempfile.TemporaryDirectory(prefix="nexa-vlm-")
+            fd, out_path = tempfile.mkstemp(
+                suffix=".jpg" if is_jpeg else ".png", dir=_downscaled_images_dir.name
+            )
+            with os.fdopen(fd, "wb") as out_file:
+                if is_jpeg:
+                    img.save(out_file, format="JPEG", quality=95)
+                else:
+                    img.save(out_file, format="PNG")
+            return out_path
+    except Exception as e:
+        # Includes Image.DecompressionBombError, which is not an OSError
+        logging.debug(f"Not downscaling {file_path}: {e}")
+        return None
+
+
+def _get_model_image_path(file_path: str, max_size: Optional[int] = None) -> Optional[str]:
+    """
+    Path of the image to hand to the model: a copy downscaled to max_size, or
+    the original if it is small enough or max_size is None.
+    """
+    try:
+        real_path = os.path.realpath(file_path)
+        st = os.stat(real_path)
+    except OSError:
+        return None
+    if max_size is None:
+        return real_path
+    key = (real_path, st.st_mtime_ns, st.st_size, max_size)
+    if key in _downscaled_images:
+        _downscaled_images.move_to_end(key)
+    else:
+        while len(_downscaled_images) >= _DOWNSCALED_IMAGES_MAX:
+            _, stale_path = _downscaled_images.popitem(last=False)
+            if stale_path is not None:
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+        _downscaled_images[key] = _downscale_image(real_path, max_size)
+    return _downscaled_images[key] or real_path
+
+
+# Streamed output is flushed every 8 tokens or 50 ms, whichever comes first
+_STREAM_FLUSH_TOKENS = 8
+_STREAM_FLUSH_INTERVAL = 0.05
+
+
+def _write_stream(pending: List[str]):
+    if pending:
+        sys.stdout.write("".join(pending))
+        sys.stdout.flush()
+        pending.clear()
+
+
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are an assistant who perfectly describes images.",
+}
+
+
 # HACK: This is moved from nexa.constants to avoid circular imports
-NEXA_PROJECTOR_HANDLER_MAP: dict[str, Llava15ChatHandler] = {
-    "nanollava": NanoLlavaChatHandler,
-    "nanoLLaVA:fp16": NanoLlavaChatHandler,
-    "llava-phi3": Llava15ChatHandler,
-    "llava-phi-3-mini:q4_0": Llava15ChatHandler,
-    "llava-phi-3-mini:fp16": Llava15ChatHandler,
-    "llava-llama3": Llava15ChatHandler,
-    "llava-llama-3-8b-v1.1:q4_0": Llava15ChatHandler,
-    "llava-llama-3-8b-v1.1:fp16": Llava15ChatHandler,
-    "llava1.6-mistral": Llava16ChatHandler,
-    "llava-v1.6-mistral-7b:q4_0": Llava16ChatHandler,
-    "llava-v1.6-mistral-7b:fp16": Llava16ChatHandler,
-    "llava1.6-vicuna": Llava16ChatHandler,
-    "llava-v1.6-vicuna-7b:q4_0": Llava16ChatHandler,
-    "llava-v1.6-vicuna-7b:fp16": Llava16ChatHandler,
+# Handler class names in nexa.gguf.llama.llama_chat_format, resolved in
+# _load_model so importing this module does not load the llama.cpp library.
+NEXA_PROJECTOR_HANDLER_MAP: dict[str, str] = {
+    "nanollava": "NanoLlavaChatHandler",
+    "nanoLLaVA:fp16": "NanoLlavaChatHandler",
+    "llava-phi3": "Llava15ChatHandler",
+    "llava-phi-3-mini:q4_0": "Llava15ChatHandler",
+    "llava-phi-3-mini:fp16": "Llava15ChatHandler",
+    "llava-llama3": "Llava15ChatHandler",
+    "llava-llama-3-8b-v1.1:q4_0": "Llava15ChatHandler",
+    "llava-llama-3-8b-v1.1:fp16": "Llava15ChatHandler",
+    "llava1.6-mistral": "Llava16ChatHandler",
+    "llava-v1.6-mistral-7b:q4_0": "Llava16ChatHandler",
+    "llava-v1.6-mistral-7b:fp16": "Llava16ChatHandler",
+    "llava1.6-vicuna": "Llava16ChatHandler",
+    "llava-v1.6-vicuna-7b:q4_0": "Llava16ChatHandler",
+    "llava-v1.6-vicuna-7b:fp16": "Llava16ChatHandler",
 }
 
 assert (
@@ -86,15 +241,29 @@ class NexaVLMInference:
     streamlit (bool): Run the inference in Streamlit UI.
     temperature (float): Temperature for sampling.
     max_new_tokens (int): Maximum number of new tokens to generate.
+    nctx (int): Context length of the model, including image tokens (default 4096).
     top_k (int): Top-k sampling parameter.
     top_p (float): Top-p sampling parameter
+    n_threads (int): Number of threads used for generation.
+    n_threads_batch (int): Number of threads used for prompt and image processing.
+    n_batch (int): Logical batch size for prompt processing.
+    n_ubatch (int): Physical batch size for prompt processing.
+    n_gpu_layers (int): Number of layers to offload to GPU, overrides the device default.
+    image_embed_cache_size (int): Number of image embeddings kept for reuse across turns.
+    flash_attn (bool): Use the fused flash attention kernel (default True). Speeds up
+        prefill of the image tokens; disable on backends that lack the kernel.
     """
     def __init__(self, model_path=None, local_path=None, projector_local_path=None, stop_words=None, device="auto", **kwargs):
         if model_path is None and local_path is None:
             raise ValueError("Either model_path or local_path must be provided.")
         
-        self.params = DEFAULT_TEXT_GEN_PARAMS.copy()
+        self.params = DEFAULT_VLM_GEN_PARAMS.copy()
         self.params.update(kwargs)
+        if self.params["nctx"] < 1024:
+            logging.warning(
+                f"nctx={self.params['nctx']} leaves little room for the prompt: "
+                "a single image takes ~576 tokens of context."
+            )
         self.model = None
         self.projector = None
         self.projector_path = NEXA_RUN_PROJECTOR_MAP.get(model_path, None)
@@ -108,19 +277,20 @@ class NexaVLMInference:
         elif self.downloaded_path is not None:
             if model_path in NEXA_RUN_MODEL_MAP_VLM:
                 self.projector_path = NEXA_RUN_PROJECTOR_MAP[model_path]
-                self.projector_downloaded_path, _ = pull_model(self.projector_path, **kwargs)
+                self.projector_downloaded_path = self._pull_model(self.projector_path, **kwargs)
         elif model_path in NEXA_RUN_MODEL_MAP_VLM:
             self.model_path = NEXA_RUN_MODEL_MAP_VLM[model_path]
             self.projector_path = NEXA_RUN_PROJECTOR_MAP[model_path]
-            self.downloaded_path, _ = pull_model(self.model_path, **kwargs)
-            self.projector_downloaded_path, _ = pull_model(self.projector_path, **kwargs)
+            self.downloaded_path = self._pull_model(self.model_path, **kwargs)
+            self.projector_downloaded_path = self._pull_model(self.projector_path, **kwargs)
         elif Path(model_path).parent.exists():
             local_dir = Path(model_path).parent
             model_name = Path(model_path).name
             tag_and_ext = model_name.split(":")[-1]
-            self.downloaded_path = local_dir / f"model-{tag_and_ext}"
-            self.projector_downloaded_path = local_dir / f"projector-{tag_and_ext}"
-            if not (self.downloaded_path.exists() and self.projector_downloaded_path.exists()):
+            self.downloaded_path = str(local_dir / f"model-{tag_and_ext}")
+            self.projector_downloaded_path = str(local_dir / f"projector-{tag_and_ext}")
+            # isfile is a single stat() that also rejects directories
+            if not (os.path.isfile(self.downloaded_path) and os.path.isfile(self.projector_downloaded_path)):
                 logging.error(
                     f"Model or projector not found in {local_dir}. "
                     "Make sure to name them as 'model-<tag>.gguf' and 'projector-<tag>.gguf'."
@@ -138,7 +308,7 @@ class NexaVLMInference:
             exit(1)
 
         self.projector_handler = NEXA_PROJECTOR_HANDLER_MAP.get(
-            model_path, Llava15ChatHandler
+            model_path, "Llava15ChatHandler"
         )
         self.stop_words = stop_words if stop_words else []
         self.profiling = kwargs.get("profiling", False)
@@ -153,14 +323,30 @@ class NexaVLMInference:
                 )
                 exit(1)
 
+    @staticmethod
+    def _pull_model(model_path, **kwargs):
+        # Warm cache: a stat() plus one model list lookup, skipping pull_model's
+        # second JSON parse and its "already exists" print
+        if not kwargs.get("local_download_path"):
+            cached_path = get_cached_official_model_path(model_path)
+            if cached_path is not None:
+                return cached_path
+        downloaded_path, _ = pull_model(model_path, **kwargs)
+        return downloaded_path
+
     @SpinningCursorAnimation()
     def _load_model(self):
         logging.debug(f"Loading model from {self.downloaded_path}")
         start_time = time.time()
         with suppress_stdout_stderr():
+            from nexa.gguf.llama import llama_chat_format
+
+            projector_handler = getattr(llama_chat_format, self.projector_handler)
             self.projector = (
-                self.projector_handler(
-                    clip_model_path=self.projector_downloaded_path, verbose=False
+                projector_handler(
+                    clip_model_path=self.projector_downloaded_path,
+                    verbose=False,
+                    image_embed_cache_size=self.params.get("image_embed_cache_size", 4),
                 )
                 if self.projector_downloaded_path
                 else None
@@ -171,14 +357,17 @@ class NexaVLMInference:
                     n_gpu_layers = -1 if is_gpu_available() else 0
                 elif self.device == "cpu":
                     n_gpu_layers = 0
-                
+                n_gpu_layers = self.params.get("n_gpu_layers", n_gpu_layers)
+
                 self.model = Llama(
                     model_path=self.downloaded_path,
                     chat_handler=self.projector,
                     verbose=False,
                     chat_format=self.chat_format,
-                    n_ctx=self.params.get("nctx", 2048),
+                    n_ctx=self.params["nctx"],
                     n_gpu_layers=n_gpu_layers,
+                    flash_attn=self.params.get("flash_attn", True),
+                    **self._get_threading_params(use_gpu=n_gpu_layers != 0),
                 )
             except Exception as e:
                 logging.error(
@@ -190,14 +379,37 @@ class NexaVLMInference:
                     chat_handler=self.projector,
                     verbose=False,
                     chat_format=self.chat_format,
-                    n_ctx=self.params.get("nctx", 2048),
+                    n_ctx=self.params["nctx"],
                     n_gpu_layers=0,  # hardcode to use CPU
+                    flash_attn=False,  # the first load may have failed on the kernel
+                    **self._get_threading_params(use_gpu=False),
                 )
 
         load_time = time.time() - start_time
         if self.profiling:
             logging.info(f"Model loaded in {load_time:.2f} seconds")
 
+    def _get_threading_params(self, use_gpu: bool) -> dict:
+        """
+        Resolve thread and batch sizes for the llama.cpp context.
+
+        On CPU, generation is memory-bound and scales best with one thread per
+        physical core (approximated as half the logical cores). With full GPU
+        offload the CPU threads only drive the backend, so more than 8 rarely
+        helps. Prompt processing (including the image embeddings) is
+        compute-bound and uses every logical core by default.
+        """
+        cpu_count = os.cpu_count() or 1
+        default_n_threads = max(cpu_count // 2, 1)
+        if use_gpu:
+            default_n_threads = min(max(default_n_threads, 4), 8, cpu_count)
+        return {
+            "n_threads": self.params.get("n_threads") or default_n_threads,
+            "n_threads_batch": self.params.get("n_threads_batch") or cpu_count,
+            "n_batch": self.params.get("n_batch", 512),
+            "n_ubatch": self.params.get("n_ubatch", 512),
+        }
+
     def embed(
         self,
         input: Union[str, List[str]],
@@ -223,14 +435,14 @@ class NexaVLMInference:
     def run(self):
         from nexa.gguf.llama._utils_spinner import start_spinner, stop_spinner
 
+        readline.set_completer_delims(" \t\n;")
+        readline.parse_and_bind("tab: complete")
+        readline.set_completer(_complete)
+
         # I just use completion, no conversation history
         while True:
             try:
                 generated_text = ""
-                readline.set_completer_delims(" \t\n;")
-                readline.parse_and_bind("tab: complete")
-                readline.set_completer(_complete)
-
                 image_path = nexa_prompt("Image Path (leave empty if no image)")
                 if image_path and not os.path.exists(image_path):
                     print(f"'{image_path}' is not a path to image. Will ignore.")
@@ -249,13 +461,26 @@ class NexaVLMInference:
                 output = self._chat(user_input, image_path)
                 stop_spinner(stop_event, spinner_thread)
 
-                for chunk in output:
-                    delta = chunk["choices"][0]["delta"]
-                    if "role" in delta:
-                        print(delta["role"], end=": ", flush=True)
-                    elif "content" in delta:
-                        print(delta["content"], end="", flush=True)
-                        generated_text += delta["content"]            
+                # One write+flush per batch of tokens instead of per token
+                pending = []
+                last_flush = time.monotonic()
+                try:
+                    for chunk in output:
+                        delta = chunk["choices"][0]["delta"]
+                        if "role" in delta:
+                            pending.append(f"{delta['role']}: ")
+                        elif "content" in delta:
+                            pending.append(delta["content"])
+                            generated_text += delta["content"]
+                        now = time.monotonic()
+                        if (
+                            len(pending) >= _STREAM_FLUSH_TOKENS
+                            or now - last_flush >= _STREAM_FLUSH_INTERVAL
+                        ):
+                            _write_stream(pending)
+                            last_flush = now
+                finally:
+                    _write_stream(pending)
 
             except KeyboardInterrupt:
                 pass
@@ -321,24 +546,36 @@ class NexaVLMInference:
             stop=stop,
         )
 
+    def _get_image_url(self, image_path: str) -> Optional[str]:
+        if not image_path:
+            return None
+        model_image_path = _get_model_image_path(
+            image_path, _HANDLER_MAX_IMAGE_SIZE.get(self.projector_handler)
+        )
+        if model_image_path is None:
+            return None
+        # Every handler in NEXA_PROJECTOR_HANDLER_MAP is a Llava15ChatHandler,
+        # which reads file:// URLs directly, skipping the base64 encode/decode
+        # round-trip of a data URI.
+        return Path(model_image_path).as_uri()
+
     def _chat(self, user_input: str, image_path: str = None) -> Iterator:
-        data_uri = image_to_base64_data_uri(image_path) if image_path else None
+        image_url = self._get_image_url(image_path)
 
         content = [{"type": "text", "text": user_input}]
-        if data_uri:
-            content.insert(0, {"type": "image_url", "image_url": {"url": data_uri}})
+        if image_url:
+            content.insert(0, {"type": "image_url", "image_url": {"url": image_url}})
 
         messages = [
-            {
-                "role": "system",
-                "content": "You are an assistant who perfectly describes images.",
-            },
+            _SYSTEM_MESSAGE,
             {
                 "role": "user",
                 "content": content,
             },
         ]
 
+        # Sampling params are read per call rather than cached on the instance:
+        # the Streamlit UI updates self.params after the model is loaded.
         return self.model.create_chat_completion(
             messages=messages,
             temperature=self.params["temperature"],
@@ -359,6 +596,8 @@ class NexaVLMInference:
             Path(os.path.abspath(__file__)).parent / "streamlit" / "streamlit_vlm.py"
         )
 
+        from streamlit.web import cli as stcli
+
         sys.argv = ["streamlit", "run", str(streamlit_script_path), model_path, str(is_local_path), str(hf), str(projector_local_path)]
         sys.exit(stcli.main())
 
@@ -391,9 +630,43 @@ if __name__ == "__main__":
     parser.add_argument(
         "--nctx",
         type=int,
-        default=2048,
+        default=4096,
         help="Maximum context length of the model you're using"
     )
+    parser.add_argument(
+        "--n_threads",
+        type=int,
+        help="Number of threads to use for generation",
+    )
+    parser.add_argument(
+        "--n_threads_batch",
+        type=int,
+        help="Number of threads to use for prompt and image processing",
+    )
+    parser.add_argument(
+        "--n_batch",
+        type=int,
+        default=512,
+        help="Logical batch size for prompt processing",
+    )
+    parser.add_argument(
+        "--n_ubatch",
+        type=int,
+        default=512,
+        help="Physical batch size for prompt processing",
+    )
+    parser.add_argument(
+        "-ngl",
+        "--n_gpu_layers",
+        type=int,
+        help="Number of layers to offload to GPU",
+    )
+    parser.add_argument(
+        "--no_flash_attn",
+        dest="flash_attn",
+        action="store_false",
+        help="Disable flash attention, e.g. on backends without the kernel",
+    )
     parser.add_argument(
         "-sw",
         "--stop_words",
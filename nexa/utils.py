@@ -1,14 +1,13 @@
 import itertools
+import os
 import platform
 import sys
 import threading
-import time
 from functools import partial, wraps
 from importlib.metadata import PackageNotFoundError, distribution
 from typing import Dict, List
 import json
 import logging
-import streamlit as st
 from nexa.constants import (
     EXIT_COMMANDS,
     EXIT_REMINDER,
@@ -18,6 +17,8 @@ from nexa.constants import (
 
 def get_available_models() -> Dict[str, dict]:
     """Get list of available computer vision (cv) models from the model list JSON file."""
+    import streamlit as st
+
     # check whether the model list file exists:
     if not NEXA_MODEL_LIST_PATH.exists():
         st.error("Model list file not found")
@@ -82,6 +83,8 @@ def update_model_options(
     model_map: Dict[str, str]
 ) -> None:
     """Update the model options in session state and force a refresh."""
+    import streamlit as st
+
     try:
         fresh_options = get_model_options(specified_run_type, model_map)
         st.session_state.model_options = fresh_options  # update session state with new options
@@ -258,19 +261,31 @@ class SpinningCursorAnimation:
     """
 
     def __init__(self, alternate_stream: bool = True):
-        frames = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
-        self.spinner = itertools.cycle(frames)
+        self.frames = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
         self.stop_spinning = threading.Event()
         self._use_alternate_stream = alternate_stream
         self.stream = sys.stdout
+        self._fd = None
 
-    def _spin(self):
-        while not self.stop_spinning.is_set():
-            self.stream.write(f"\r{next(self.spinner)} ")
+    def _write(self, data: bytes):
+        if self._fd is not None:
+            os.write(self._fd, data)
+        else:
+            self.stream.write(data.decode(self._encoding))
             self.stream.flush()
-            time.sleep(0.1)
+
+    def _spin(self):
+        encoded_frames = [
+            f"\r{frame} ".encode(self._encoding, errors="replace")
+            for frame in self.frames
+        ]
+        for frame in itertools.cycle(encoded_frames):
             if self.stop_spinning.is_set():
                 break
+            self._write(frame)
+            # Returns as soon as __exit__ sets the event
+            if self.stop_spinning.wait(0.1):
+                break
 
     def __enter__(self):
         if self._use_alternate_stream:
@@ -285,6 +300,14 @@ class SpinningCursorAnimation:
                     self.stream = open('/dev/tty', "w")
                 except (FileNotFoundError, OSError):
                     self.stream = open('/dev/stdout', "w")
+        self._encoding = getattr(self.stream, "encoding", None) or "utf-8"
+        try:
+            # Write frames straight to the file descriptor, bypassing the
+            # buffered text layer and the per-frame flush
+            self._fd = self.stream.fileno()
+        except (AttributeError, OSError, ValueError):
+            self._fd = None
+        self.stop_spinning.clear()
         self.thread = threading.Thread(target=self._spin)
         self.thread.start()
         return self
@@ -292,8 +315,8 @@ class SpinningCursorAnimation:
     def __exit__(self, exc_type, exc_value, traceback):
         self.stop_spinning.set()
         self.thread.join()
-        self.stream.write("\r")
         self.stream.flush()
+        self._write(b"\r")
         if self._use_alternate_stream:
             self.stream.close()
 
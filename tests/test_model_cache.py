@@ -0,0 +1,57 @@
+import pytest
+
+from nexa import general
+
+MODEL_PATH = "llava-phi-3-mini:model-q4_0"
+
+
+@pytest.fixture
+def model_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(general, "NEXA_MODELS_HUB_OFFICIAL_DIR", tmp_path / "official")
+    monkeypatch.setattr(general, "NEXA_MODEL_LIST_PATH", tmp_path / "model_list.json")
+    monkeypatch.delenv("NEXA_FORCE_REFRESH", raising=False)
+    path = tmp_path / "official" / "llava-phi-3-mini" / "model-q4_0.gguf"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"GGUF")
+    return path
+
+
+def _add_to_model_list(path):
+    general.add_model_to_list(MODEL_PATH, str(path), "gguf", "Multimodal")
+
+
+# Test that a downloaded model recorded in the model list is reused
+def test_cached_model_is_returned(model_file):
+    _add_to_model_list(model_file)
+    assert general.get_cached_official_model_path(MODEL_PATH) == str(model_file)
+
+
+# Test that NEXA_FORCE_REFRESH=1 bypasses the cache
+def test_force_refresh(model_file, monkeypatch):
+    _add_to_model_list(model_file)
+    monkeypatch.setenv("NEXA_FORCE_REFRESH", "1")
+    assert general.get_cached_official_model_path(MODEL_PATH) is None
+
+
+# Test that an empty file is not treated as cached
+def test_zero_byte_file(model_file):
+    _add_to_model_list(model_file)
+    model_file.write_bytes(b"")
+    assert general.get_cached_official_model_path(MODEL_PATH) is None
+
+
+# Test that a missing file is not treated as cached
+def test_missing_file(model_file):
+    _add_to_model_list(model_file)
+    model_file.unlink()
+    assert general.get_cached_official_model_path(MODEL_PATH) is None
+
+
+# Test that a file without a model list entry, e.g. from an interrupted download, is not reused
+def test_missing_model_list_entry(model_file):
+    assert general.get_cached_official_model_path(MODEL_PATH) is None
+
+
+# Test that model paths without a version are never looked up
+def test_model_path_without_version(model_file):
+    assert general.get_cached_official_model_path("llava-phi-3-mini") is None
@@ -0,0 +1,85 @@
+import base64
+import os
+
+import pytest
+
+from nexa.gguf import nexa_inference_vlm as vlm
+
+
+@pytest.fixture(autouse=True)
+def reset_dir_listing_cache(monkeypatch):
+    monkeypatch.setattr(vlm, "_dir_listing_cache", (None, 0.0, []))
+
+
+def _all_completions(text):
+    # readline calls the completer with state 0, 1, 2, ... until it gets None
+    matches = []
+    state = 0
+    while True:
+        match = vlm._complete(text, state)
+        if match is None:
+            return matches
+        matches.append(match)
+        state += 1
+
+
+# Test that directories are completed with a trailing separator
+def test_complete_marks_directories(tmp_path):
+    (tmp_path / "photos").mkdir()
+    (tmp_path / "photo.png").write_bytes(b"")
+    prefix = str(tmp_path / "pho")
+    assert _all_completions(prefix) == [
+        str(tmp_path / "photo.png"),
+        str(tmp_path / "photos") + os.sep,
+    ]
+
+
+# Test that hidden files are only offered when the prefix starts with a dot
+def test_complete_hidden_files(tmp_path):
+    (tmp_path / ".hidden.png").write_bytes(b"")
+    (tmp_path / "visible.png").write_bytes(b"")
+    assert _all_completions(str(tmp_path) + os.sep) == [str(tmp_path / "visible.png")]
+    assert _all_completions(str(tmp_path) + os.sep + ".") == [str(tmp_path / ".hidden.png")]
+
+
+# Test that the completer returns None past the last match
+def test_complete_state_protocol(tmp_path):
+    (tmp_path / "a.png").write_bytes(b"")
+    (tmp_path / "b.png").write_bytes(b"")
+    text = str(tmp_path) + os.sep
+    assert vlm._complete(text, 0) == str(tmp_path / "a.png")
+    assert vlm._complete(text, 1) == str(tmp_path / "b.png")
+    assert vlm._complete(text, 2) is None
+    assert vlm._complete(str(tmp_path / "missing"), 0) is None
+
+
+@pytest.mark.parametrize(
+    "header, mime",
+    [
+        (b"\x89PNG\r\n\x1a\n\x00\x00\x00\r", "image/png"),
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01", "image/jpeg"),
+        (b"RIFF\x00\x00\x00\x00WEBP", "image/webp"),
+        (b"GIF89a\x01\x00\x01\x00\x00\x00", "image/gif"),
+        (b"not an image", "image/png"),
+    ],
+)
+def test_detect_image_mime(header, mime):
+    assert vlm._detect_image_mime(header) == mime
+
+
+# Test that chunked encoding matches a single b64encode across chunk boundaries
+@pytest.mark.parametrize(
+    "size",
+    [
+        0,
+        1,
+        vlm._BASE64_CHUNK_SIZE - 1,
+        vlm._BASE64_CHUNK_SIZE,
+        vlm._BASE64_CHUNK_SIZE + 1,
+        3 * vlm._BASE64_CHUNK_SIZE + 2,
+    ],
+)
+def test_bytes_to_base64_data_uri(size):
+    data = b"\xff\xd8\xff" + bytes(i % 251 for i in range(size))
+    expected = "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+    assert vlm._bytes_to_base64_data_uri(data) == expected